@@ -28,7 +28,12 @@ def main():
             "web_ui.py", 
             "--server.address", "localhost",
             "--server.port", "8501",
-            "--browser.gatherUsageStats", "false"
+            "--browser.gatherUsageStats", "false",
+            # Skip the source file watcher and development tooling
+            "--server.fileWatcherType", "none",
+            "--server.runOnSave", "false",
+            "--client.toolbarMode", "minimal",
+            "--global.developmentMode", "false"
         ])
     except KeyboardInterrupt:
         print("\n🛑 Shutting down web UI...")
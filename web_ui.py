@@ -3,17 +3,27 @@ import logging
 from strands import Agent
 from strands_tools import calculator, current_time, use_aws, mcp_client, shell
 from strands.multiagent import GraphBuilder
+from strands.multiagent.base import Status
 from mcp import StdioServerParameters, stdio_client
-from strands.tools.mcp import MCPClient
+from strands.tools.mcp import MCPClient, MCPAgentTool
+from mcp.types import Tool as MCPTool
 from strands.agent.conversation_manager import SlidingWindowConversationManager
 from dotenv import load_dotenv
-import os, sys, json, yaml, time
+import os, sys, json, time, weakref, hashlib, threading, asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
-import plotly.express as px
-import pandas as pd
 from dataclasses import dataclass
+from collections import deque
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 MAX_NODE_EXECUTIONS = 25
+MAX_AGENT_EVENTS = 50
+TOOL_CACHE_TTL = 300
+TOOL_CACHE_FILE = ".mcp_tool_cache.json"
 
 # Configure page
 st.set_page_config(
@@ -30,6 +40,15 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@st.cache_resource
+def _tool_cache_state():
+    """Process-wide MCP tool schema cache and its lock, shared across reruns and sessions"""
+    return {}, threading.Lock()
+
+# MCP tool schemas keyed by server identity: {key: (timestamp, [MCPTool, ...])}.
+# Streamlit re-executes this script on every rerun, so the objects come from st.cache_resource.
+_TOOL_CACHE, _TOOL_CACHE_LOCK = _tool_cache_state()
+
 @dataclass
 class AgentEvent:
     """Class for keeping track of an agent event"""
@@ -38,25 +57,184 @@ class AgentEvent:
     tool_name: str = ""
     tool_input: str = ""
     message: str = ""
+    timestamp_str: str = ""
+
+# Streamlit re-executes this script on every rerun, so use its cache to share parsed prompts across reruns and sessions
+@st.cache_data
+def _load_prompt_cached(file_path: str) -> str:
+    """Read and parse a system prompt YAML file once per path"""
+    import yaml
+
+    # Prefer the libyaml-backed loader when it is available
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(file_path, 'r', encoding='utf-8') as file:
+        config = yaml.load(file, Loader=loader)
+    return config["system_prompt"]
+
+def _server_cache_key(server: StdioServerParameters) -> str:
+    """Build a tool cache key from the MCP server command and arguments"""
+    return hashlib.sha256(json.dumps([server.command, server.args]).encode("utf-8")).hexdigest()
+
+def _read_tool_cache_file() -> Dict[str, Any]:
+    """Read the persisted tool schemas, returning an empty cache if unavailable"""
+    try:
+        with open(TOOL_CACHE_FILE, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.debug(f"Tool cache file not loaded: {e}")
+        return {}
+
+def _write_tool_cache_file(cache: Dict[str, Any]):
+    """Persist tool schemas so they survive process restarts"""
+    try:
+        with open(TOOL_CACHE_FILE, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+    except OSError as e:
+        logger.warning(f"Could not write tool cache file: {e}")
+
+def _cached_list_tools(client: MCPClient, key: str, ttl: float = TOOL_CACHE_TTL) -> List[MCPAgentTool]:
+    """List MCP tools, serving the schemas from memory or disk while they are fresh"""
+    now = time.time()
+    entry = _TOOL_CACHE.get(key)
+    if entry is None:
+        disk_entry = _read_tool_cache_file().get(key)
+        if disk_entry:
+            try:
+                entry = (disk_entry["timestamp"], [MCPTool.model_validate(t) for t in disk_entry["tools"]])
+                _TOOL_CACHE[key] = entry
+            except Exception as e:
+                logger.warning(f"Ignoring invalid tool cache entry: {e}")
+
+    if entry is not None and now - entry[0] < ttl:
+        # Bind the cached schemas to the live client so tool calls use its session
+        return [MCPAgentTool(mcp_tool, client) for mcp_tool in entry[1]]
+
+    tools = client.list_tools_sync()
+    schemas = [tool.mcp_tool for tool in tools]
+    _TOOL_CACHE[key] = (now, schemas)
+
+    with _TOOL_CACHE_LOCK:
+        disk_cache = _read_tool_cache_file()
+        disk_cache[key] = {"timestamp": now, "tools": [schema.model_dump(mode="json") for schema in schemas]}
+        _write_tool_cache_file(disk_cache)
+    return tools
+
+def _invalidate_tool_cache(key: str):
+    """Drop cached tool schemas for an MCP server from memory and disk"""
+    _TOOL_CACHE.pop(key, None)
+    with _TOOL_CACHE_LOCK:
+        disk_cache = _read_tool_cache_file()
+        if disk_cache.pop(key, None) is not None:
+            _write_tool_cache_file(disk_cache)
+
+def _dumps(obj: Any) -> str:
+    """Serialize to a JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+def _handle_message_start(payload):
+    return "control", "", "", "Message generation started"
+
+def _handle_message_stop(payload):
+    return "control", "", "", "Message generation ended"
+
+def _handle_content_block_start(payload):
+    tool_use = payload.get("start", {}).get("toolUse")
+    tool_name = tool_use["name"] if tool_use else ""
+    return "control", tool_name, "", "Content block generation started"
+
+def _handle_content_block_stop(payload):
+    return "control", "", "", "Content block generation ended"
+
+def _handle_content_block_delta(payload):
+    delta = payload.get("delta", {})
+    if "text" in delta:
+        return "text", "", "", delta["text"]
+    if "toolUse" in delta:
+        return "tool_use", "", delta["toolUse"]["input"], ""
+    return None
+
+def _handle_metadata(payload):
+    return "metadata", "", "", f"Metadata: {_dumps(payload)}"
+
+# Handlers for streamed model events, keyed by the event kind.
+# Each returns (event_type, tool_name, tool_input, message), or None to leave the event unchanged.
+_EVENT_DISPATCH = {
+    "messageStart": _handle_message_start,
+    "messageStop": _handle_message_stop,
+    "contentBlockStart": _handle_content_block_start,
+    "contentBlockStop": _handle_content_block_stop,
+    "contentBlockDelta": _handle_content_block_delta,
+    "metadata": _handle_metadata,
+}
+
+def _close_mcp_clients(open_clients: list, lock: threading.Lock):
+    """Exit every open MCP client session, draining the list in place"""
+    with lock:
+        clients = list(open_clients)
+        open_clients.clear()
+
+    for client in clients:
+        try:
+            client.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Could not stop MCP client session: {e}")
+
+def _all_completed(*node_ids):
+    """Build an edge condition that holds once every given graph node has completed"""
+    def condition(state):
+        return all(
+            node_id in state.results and state.results[node_id].status == Status.COMPLETED
+            for node_id in node_ids
+        )
+    return condition
 
 class StrandsAgentManager:
     """Manages the Strands agents and their interactions"""
     def __init__(self):
         self.graph = None
+        # Snapshot of the environment configuration used by the tools and the UI
+        self.env = {
+            "aws_key": os.getenv("AWS_ACCESS_KEY_ID", ""),
+            "aws_secret": os.getenv("AWS_SECRET_ACCESS_KEY", ""),
+            "aws_region": os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
+            "github_token": os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN", ""),
+        }
         self.mcp_client_aws_docs = None
         self.mcp_client_github = None
         self.all_tools = []
         self.github_tools = []
-        self.agent_events = []
+        # Bounded event history holding only the events shown in the UI
+        self.agent_events = deque(maxlen=MAX_AGENT_EVENTS)
+        self.agent_event_count = 0
+        self._open_clients = []
+        self._connected = False
+        self._tool_cache_keys = {}
+        self._lock = threading.Lock()
+        # Stop the MCP servers when this manager (i.e. its Streamlit session) is collected, or at exit.
+        # The callback must not reference self, otherwise the manager would never be collected.
+        self._finalizer = weakref.finalize(self, _close_mcp_clients, self._open_clients, self._lock)
+        self.task_executor = None
+        self.github_agent = None
         self._initialize_tools()
         self._build_graph()
+
+        # Start the MCP servers and discover their tools in the background so the UI is usable immediately
+        self._discovery_thread = threading.Thread(target=self._load_mcp_tools, daemon=True)
+        self._discovery_thread.start()
+
+    @property
+    def discovering_tools(self):
+        """Whether background MCP tool discovery is still running"""
+        return self._discovery_thread.is_alive()
     
     def load_system_prompt(self, file_path="system_prompt.yaml"):
         """Load system prompt from YAML file"""
+        import yaml
+
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                config = yaml.safe_load(file)
-            return config["system_prompt"]
+            return _load_prompt_cached(file_path)
         except FileNotFoundError:
             logger.error(f"System prompt file '{file_path}' not found")
             return "You are a helpful AI assistant that can break down complex tasks and execute them using various tools."
@@ -71,156 +249,222 @@ class StrandsAgentManager:
         
         # Load AWS docs MCP tools (optional - loaded only if environment is configured)
         self.mcp_tools_loaded = False
-        if os.getenv("AWS_ACCESS_KEY_ID"):
-            try:
-                # Load AWS MCP tools if AWS is configured
-                if os.getenv("AWS_ACCESS_KEY_ID"):
-                    # AWS documentation MCP client setup
-                    self.mcp_client_aws_docs = MCPClient(lambda: stdio_client(
-                        StdioServerParameters(
-                            command="uvx", 
-                            args=["awslabs.aws-documentation-mcp-server@latest"],
-                            env={
-                                "AWS_ACCESS_KEY_ID": os.getenv("AWS_ACCESS_KEY_ID", ""),
-                                "AWS_SECRET_ACCESS_KEY": os.getenv("AWS_SECRET_ACCESS_KEY", ""),
-                                "AWS_DEFAULT_REGION": os.getenv("AWS_DEFAULT_REGION", "us-east-1")
-                            }
-                        )
-                    ))
-                    with self.mcp_client_aws_docs:
-                        aws_tools = self.mcp_client_aws_docs.list_tools_sync()
-                        for tool in aws_tools:
-                            self.all_tools.append(tool)
-            except Exception as e:
-                logger.warning(f"Could not load AWS MCP tools: {e}")
-                self.mcp_tools_loaded = False
-                
+        if self.env["aws_key"]:
+            # AWS documentation MCP client setup
+            aws_docs_server = StdioServerParameters(
+                command="uvx", 
+                args=["awslabs.aws-documentation-mcp-server@latest"],
+                env={
+                    "AWS_ACCESS_KEY_ID": self.env["aws_key"],
+                    "AWS_SECRET_ACCESS_KEY": self.env["aws_secret"],
+                    "AWS_DEFAULT_REGION": self.env["aws_region"]
+                }
+            )
+            self.mcp_client_aws_docs = MCPClient(lambda: stdio_client(aws_docs_server))
+            self._tool_cache_keys["aws_docs"] = _server_cache_key(aws_docs_server)
+
         # Load GitHub MCP tools if GitHub is configured
-        if os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"):
-            try:
-                # GitHub MCP client setup
-                self.mcp_client_github = MCPClient(lambda: stdio_client(
-                    StdioServerParameters(
-                        command="npx", 
-                        args=["-y", "@modelcontextprotocol/server-github"],
-                        env={
-                            "GITHUB_PERSONAL_ACCESS_TOKEN": os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN", "")
-                        }
-                    )
-                ))
+        if self.env["github_token"]:
+            # GitHub MCP client setup
+            github_server = StdioServerParameters(
+                command="npx", 
+                args=["-y", "@modelcontextprotocol/server-github"],
+                env={
+                    "GITHUB_PERSONAL_ACCESS_TOKEN": self.env["github_token"]
+                }
+            )
+            self.mcp_client_github = MCPClient(lambda: stdio_client(github_server))
+            self._tool_cache_keys["github"] = _server_cache_key(github_server)
+
+    def _load_mcp_tools(self, register: bool = True):
+        """List tools from the configured MCP servers concurrently and register them as they arrive"""
+        discoveries = []
+        if self.mcp_client_aws_docs:
+            discoveries.append((self.mcp_client_aws_docs, "aws_docs"))
+        if self.mcp_client_github:
+            discoveries.append((self.mcp_client_github, "github"))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = {executor.submit(self._enter_and_list, client, name): name for client, name in discoveries}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    tools = future.result()
+                except Exception as e:
+                    logger.warning(f"Could not load {name} MCP tools: {e}")
+                    continue
 
-                # Load GitHub MCP tools if GitHub is configured  
-                with self.mcp_client_github:
-                    tools = self.mcp_client_github.list_tools_sync()  
-                    for tool in tools:
-                        self.github_tools.append(tool)
-                
-                self.mcp_tools_loaded = True
-                logger.info(f"Github tools loaded: {[tool.tool_name for tool in self.github_tools]}")
-                logger.info("MCP tools loaded successfully")
+                with self._lock:
+                    if name == "github":
+                        self.github_tools.extend(tools)
+                        self.mcp_tools_loaded = True
+                        if register:
+                            self._register_tools(self.github_agent, tools)
+                        logger.info(f"Github tools loaded: {[tool.tool_name for tool in self.github_tools]}")
+                    else:
+                        self.all_tools.extend(tools)
+                        if register:
+                            self._register_tools(self.task_executor, tools)
+                logger.info(f"{name} MCP tools loaded successfully")
+
+        self._connected = self._all_clients_open()
+
+    @staticmethod
+    def _register_tools(agent, tools):
+        """Add newly discovered tools to an agent that has already been built"""
+        if agent is None:
+            return
+        try:
+            agent.tool_registry.process_tools(tools)
+        except Exception as e:
+            logger.warning(f"Could not register tools with {agent.name}: {e}")
+
+    def _enter_and_list(self, client: MCPClient, name: str):
+        """Open the client session in the calling thread and list its tools"""
+        self._open_client(client)
+        return _cached_list_tools(client, self._tool_cache_keys[name])
+
+    def refresh_tools(self):
+        """Discard cached MCP tool schemas, list them again and rebuild the graph"""
+        self._discovery_thread.join()
+        for key in self._tool_cache_keys.values():
+            _invalidate_tool_cache(key)
+
+        self.all_tools = [calculator, current_time, use_aws, shell.shell]
+        self.github_tools = []
+        self.mcp_tools_loaded = False
+        # The graph is rebuilt with the full tool lists, so skip registering with the old agents
+        self._load_mcp_tools(register=False)
+        self._build_graph()
+
+    def connect(self):
+        """Open persistent sessions for the configured MCP clients"""
+        if self._connected:
+            return
+
+        for client in (self.mcp_client_aws_docs, self.mcp_client_github):
+            if client is None:
+                continue
+            try:
+                self._open_client(client)
             except Exception as e:
-                logger.warning(f"Could not load MCP tools: {e}")
-                self.mcp_tools_loaded = False
+                logger.warning(f"Could not start MCP client session: {e}")
+
+        self._connected = self._all_clients_open()
+
+    def _all_clients_open(self):
+        """Whether every configured MCP client has an open session"""
+        with self._lock:
+            return all(
+                client in self._open_clients
+                for client in (self.mcp_client_aws_docs, self.mcp_client_github)
+                if client is not None
+            )
+
+    def _open_client(self, client: MCPClient):
+        """Enter the client context once and track it for shutdown"""
+        with self._lock:
+            if client in self._open_clients:
+                return
+
+        client.__enter__()
+
+        with self._lock:
+            self._open_clients.append(client)
+
+    def disconnect(self):
+        """Close the persistent MCP client sessions"""
+        # Always drain: background discovery may have opened clients before setting _connected
+        _close_mcp_clients(self._open_clients, self._lock)
+        self._connected = False
 
     def process_event(self, **kwargs):
         self.event_handler_func(kwargs)
 
     def event_handler_func(self, event):
         """Shared event processor for both async iterators and callback handlers"""
+        # Only complete messages are recorded, so take the fast path for them
+        if "message" in event and "role" in event["message"]:
+            self._record_message(event["message"])
+            return
+
+        # Streaming deltas and control events are only useful as debug output
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_stream_event(event)
+
+    def _record_message(self, event_message):
+        """Record a complete agent message as an AgentEvent"""
+        content_list = []
+        if "content" in event_message:
+            for item in event_message['content']:
+                if 'toolResult' in item and "content" in item["toolResult"]:
+                    for content_item in item["toolResult"]["content"]:
+                        if 'text' in content_item:
+                            content_list.append(f"Tool Result: {content_item['text']}")
+                elif 'toolUse' in item:
+                    content_list.append(f"Tool Use: {item['toolUse']}")
+                elif 'text' in item:
+                    content_list.append(f"Message: {item['text']}")
+
+        if not content_list:
+            return
 
-        logger.info(f"Event: {event}")
         timestamp = time.time()
+        # Format the timestamp once here rather than on every UI rerun
+        ts_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+        self.agent_events.append(
+            AgentEvent(timestamp=timestamp, 
+                    event_type="message", 
+                    message=f"{event_message['role']}: " + "\n".join(content_list),
+                    timestamp_str=ts_str))
+        self.agent_event_count += 1
+
+    def _log_stream_event(self, event):
+        """Log a streaming event that is not recorded in the agent log"""
+        logger.debug(f"Event: {event}")
         event_type = "n/a"
         tool_name = ""
         tool_input = ""
         message = ""
 
         if event.get("init_event_loop", False):
-            print("🔄 Event loop initialized")
+            logger.debug("🔄 Event loop initialized")
         elif event.get("start_event_loop", False):
-            print("▶️ Event loop cycle starting")
+            logger.debug("▶️ Event loop cycle starting")
         elif event.get("start", False):
-            print("▶️ Starting")
+            logger.debug("▶️ Starting")
 
-        
         # Agent is invoking a tool
         if "current_tool_use" in event and event["current_tool_use"].get("name"):
             tool_name = event["current_tool_use"]["name"]
-            tool_input = json.dumps(event['current_tool_use'].get('input', {}))
-            print(f"🔧 Using tool: {tool_name}")
-            print(f"   Input: {tool_input}")
+            tool_input = _dumps(event['current_tool_use'].get('input', {}))
             event_type = "tool_use"
 
         # Agent is producing text output
         if "data" in event:
-            data_snippet = event["data"]
-            print(f"📟 Text: {data_snippet}")
             event_type = "text"
             message = event["data"]
 
-        if "event" in event:
-            if "messageStart" in event["event"]:
-                message = "Message generation started"
-                event_type = "control"
-
-            if "messageStop" in event["event"]:
-                message = "Message generation ended"
-                event_type = "control"
-
-            elif "contentBlockStart" in event["event"]:
-                if "start" in event["event"]["contentBlockStart"] and "toolUse" in event["event"]["contentBlockStart"]["start"]:
-                    event_type = "tool_use"
-                    tool_name = event["event"]["contentBlockStart"]["start"]["toolUse"]["name"]
-
-                message = "Content block generation started"
-                event_type = "control"
-
-            elif "contentBlockStop" in event["event"]:
-                message = "Content block generation ended"
-                event_type = "control"
-
-            elif "contentBlockDelta" in event["event"]:
-                if "delta" in event["event"]["contentBlockDelta"] and "text" in event["event"]["contentBlockDelta"]["delta"]:
-                    event_type = "text"
-                    message = event["event"]["contentBlockDelta"]["delta"]["text"]
-                elif "delta" in event["event"]["contentBlockDelta"] and "toolUse" in event["event"]["contentBlockDelta"]["delta"]:
-                    event_type = "tool_use"
-                    tool_input = event["event"]["contentBlockDelta"]["delta"]["toolUse"]["input"]
-
-            elif "metadata" in event["event"]:
-                message = f"Metadata: {json.dumps(event['event']['metadata'])}"
-                event_type = "metadata"
+        # Streamed model events carry exactly one event kind
+        inner = event.get("event")
+        if inner:
+            kind = next(iter(inner), None)
+            handler = _EVENT_DISPATCH.get(kind)
+            if handler:
+                handled = handler(inner[kind])
+                if handled:
+                    event_type, tool_name, tool_input, message = handled
     
         if "delta" in event:
             if "current_tool_use" in event["delta"]:
                 tool_name = event["delta"]["current_tool_use"]["name"]
                 tool_input = event['delta']['current_tool_use']["input"]
                 event_type = "tool_use"
-            
-        if "message" in event and "role" in event["message"]:            
-            content_list = []
-            if "content" in event['message']:
-                for item in event['message']['content']:
-                    if 'toolResult' in item and "content" in item["toolResult"]:
-                        for content_item in item["toolResult"]["content"]:
-                            if 'text' in content_item:
-                                content_list.append(f"Tool Result: {content_item['text']}")
-                    elif 'toolUse' in item:
-                        content_list.append(f"Tool Use: {item['toolUse']}")
-                    elif 'text' in item:
-                        content_list.append(f"Message: {item['text']}")
-
-            if content_list:
-                message = f"{event['message']['role']}: " + "\n".join(content_list)
-                event_type = "message"
-
-        if event_type in ["message"]:
-            self.agent_events.append(
-                AgentEvent(timestamp=timestamp, 
-                        event_type=event_type, 
-                        tool_name=tool_name, 
-                        tool_input=tool_input, 
-                        message=message))
+
+        if event_type == "tool_use":
+            logger.debug(f"🔧 Using tool: {tool_name}, input: {tool_input}")
+        elif event_type != "n/a":
+            logger.debug(f"📟 {event_type}: {message}")
 
     def _build_graph(self):
         """Build the agent graph"""
@@ -258,11 +502,14 @@ class StrandsAgentManager:
         logger.info(kubectl_command_agent.system_prompt)
 
         # GitHub operations agent
-        github_tools = self.github_tools if self.github_tools else []
+        with self._lock:
+            github_tools = list(self.github_tools)
+            # Shell commands (kubectl, git, ...) belong to the kubectl/GitHub branch running in parallel
+            executor_tools = [tool for tool in self.all_tools if tool is not shell.shell]
         github_tools.append(shell.shell)  # Add shell tool for executing GitHub CLI commands if needed
         logger.info(f"GitHub tools available: {[tool.tool_name for tool in github_tools]}")
 
-        github_agent = Agent(
+        self.github_agent = github_agent = Agent(
             name="github_agent",
             system_prompt=self.load_system_prompt("system_prompt_github_agent.yaml") or
                          "You are a GitHub operations agent. Use GitHub MCP tools to interact with GitHub repositories, issues, pull requests, and more.",
@@ -272,32 +519,39 @@ class StrandsAgentManager:
         )
 
         # Task executor agent  
-        task_executor = Agent(
+        self.task_executor = task_executor = Agent(
             name="task_executor",
             system_prompt='''You are a task execution agent that processes tasks recursively.
             
             When you receive input:
-            1. If it's a JSON array of tasks: Execute ALL tasks in the array sequentially
+            1. If it's a JSON array of tasks: Execute the tasks in the array sequentially
             2. If it's a single task: Execute that task directly
             
+            Kubernetes (kubectl) and GitHub tasks are handled by other agents running in parallel with you.
+            SKIP those tasks and report them with status "skipped"; never attempt them yourself.
+            
             For JSON array processing:
             - Process each task: {"index": <index>, "task_name": <name>, "task_description": <description>}
-            - For each task, use appropriate tools to execute it:
+            - For each remaining task, use appropriate tools to execute it:
               • AWS operations: use_aws tool
-              • GitHub operations: GitHub MCP tools
-              • Shell/Bash commands: shell tool (for kubectl, docker, git, etc.)
+              • AWS documentation: AWS documentation MCP tools
               • Mathematical calculations: calculator tool
               • Time operations: current_time tool
             - Collect all results and return as JSON array:
               [
-                {"index": <index>, "task_name": <name>, "result": <result>, "status": "completed/failed"},
+                {"index": <index>, "task_name": <name>, "result": <result>, "status": "completed/failed/skipped"},
                 ...
               ]
             
+            You MUST follow these guidelines strictly:
+            - NEVER execute or suggest destructive actions unless the user explicitly confirms.
+            - ALWAYS ask for confirmation before running operations that may MODIFY AWS resources (create, update, put, modify, delete, terminate, stop, reboot, attach, detach).
+            - Prefer read-only operations (describe, list, get) when the task asks for insights or diagnostics.
+            
             Execute tasks thoroughly using the most appropriate tools based on task requirements.
             Log progress as you execute each task.''',
             model="global.anthropic.claude-sonnet-4-5-20250929-v1:0",
-            tools=self.all_tools
+            tools=executor_tools
         )
         
         # Result aggregator agent
@@ -337,13 +591,19 @@ class StrandsAgentManager:
         # Set up the workflow for Kubernetes and GitHub tasks
         builder.add_edge("task_decomposer", "kubectl_command_agent")
         builder.add_edge("kubectl_command_agent", "github_agent")
-        builder.add_edge("github_agent", "result_aggregator")
+
+        # Run the general task executor alongside the kubectl/GitHub branch and fan both into the aggregator.
+        # A node runs as soon as any incoming edge fires, so both edges wait for both branches to complete.
+        both_branches_done = _all_completed("github_agent", "task_executor")
+        builder.add_edge("github_agent", "result_aggregator", condition=both_branches_done)
+        builder.add_edge("task_decomposer", "task_executor")
+        builder.add_edge("task_executor", "result_aggregator", condition=both_branches_done)
         builder.set_entry_point("task_decomposer")
         builder.set_max_node_executions(MAX_NODE_EXECUTIONS)
         
         self.graph = builder.build()
     
-    def execute_query(self, query: str, progress_callback=None):
+    async def execute_query(self, query: str, progress_callback=None):
         """Execute a query using the agent graph"""
         try:
             if progress_callback:
@@ -352,8 +612,9 @@ class StrandsAgentManager:
             if self.graph is None:
                 raise ValueError("Agent graph not initialized properly")
 
-            with self.mcp_client_github:
-                result = self.graph(query)
+            # Wait for background tool discovery; its MCP sessions stay open and are reused by the agents
+            await asyncio.to_thread(self._discovery_thread.join)
+            result = await self.graph.invoke_async(query)
 
             if progress_callback:
                 progress_callback("✅ Task execution completed!")
@@ -367,52 +628,100 @@ class StrandsAgentManager:
             logger.error(error_msg)
             return {"success": False, "result": None, "error": error_msg}
     
+    @staticmethod
+    def _node_result_text(node_result):
+        """Return the last text block of a node's agent message, or None if it has none"""
+        try:
+            return str(node_result.result.message['content'][-1]['text'])
+        except (AttributeError, KeyError, IndexError, TypeError):
+            return None
+
     def _extract_final_result(self, graph_result):
         """Extract only the final result from the result_aggregator agent"""
+        # If the result is a string, return it directly
+        if isinstance(graph_result, str):
+            return graph_result
+
+        # The last execution result should be from result_aggregator
         try:
-            # If the result has execution_order, get the last agent's result
-            if hasattr(graph_result, 'execution_order') and graph_result.execution_order:
-                # Get the last execution result (should be from result_aggregator)
-                last_execution = graph_result.execution_order[-1]
-                if hasattr(last_execution, 'result') and hasattr(last_execution.result, 'result'):
-                    # Access the AgentResult within NodeResult
-                    agent_result = last_execution.result.result
-                    if hasattr(agent_result, 'message') and 'content' in agent_result.message:
-                        return str(agent_result.message['content'][-1]['text'])
-            
-            # Try to get result from results dictionary using the correct agent name
-            if hasattr(graph_result, 'results') and 'result_aggregator' in graph_result.results:
-                node_result = graph_result.results['result_aggregator']
-                if hasattr(node_result, 'result') and hasattr(node_result.result, 'message'):
-                    return str(node_result.result.message['content'][-1]['text'])
-            
-            # If the result is a string, return it directly
-            if isinstance(graph_result, str):
-                return graph_result
-            
-            # Fallback to string representation
-            return str(graph_result)
-            
-        except Exception as e:
-            logger.warning(f"Could not extract final result: {e}")
-            # More detailed fallback - try to find any content in the result
-            try:
-                if hasattr(graph_result, 'results') and not isinstance(graph_result, str):
-                    for agent_name, node_result in graph_result.results.items():
-                        if hasattr(node_result, 'result') and hasattr(node_result.result, 'message'):
-                            if 'content' in node_result.result.message:
-                                logger.info(f"Using result from agent: {agent_name}")
-                                return str(node_result.result.message['content'][-1]['text'])
-            except Exception as fallback_error:
-                logger.warning(f"Fallback extraction also failed: {fallback_error}")
-            
-            return str(graph_result)
+            final_text = self._node_result_text(graph_result.execution_order[-1].result)
+        except (AttributeError, IndexError, TypeError):
+            final_text = None
+        if final_text is not None:
+            return final_text
+
+        # Try to get result from results dictionary using the correct agent name
+        results = getattr(graph_result, 'results', None) or {}
+        final_text = self._node_result_text(results.get('result_aggregator'))
+        if final_text is not None:
+            return final_text
+
+        # Fall back to the first agent that produced any content
+        logger.warning("Could not extract final result from result_aggregator")
+        final_text = next((text for text in map(self._node_result_text, results.values()) if text is not None), None)
+        return final_text if final_text is not None else str(graph_result)
+
+# Static sidebar and example content, kept out of main() and rendered with a single st.markdown call
+TOOLS_INFO = (
+    ("AWS Operations", "✅ use_aws tool"),
+    ("Shell Commands", "✅ shell tool (kubectl, docker, git)"),
+    ("Mathematics", "✅ calculator tool"),
+    ("Time Operations", "✅ current_time tool"),
+    ("GitHub MCP", "⚠️ Available when configured"),
+    ("AWS Docs MCP", "⚠️ Available when configured"),
+)
+TOOLS_INFO_MD = "| Tool | Status |\n|---|---|\n" + "\n".join(f"| {tool} | {status} |" for tool, status in TOOLS_INFO)
+
+EXAMPLE_QUERIES = (
+    "Find issues with EKS cluster sliverblaze",
+    "List all AWS EC2 instances in us-east-1",
+    "Check kubectl cluster info and node status",
+    "Calculate the average of 10, 20, 30, 40, 50",
+    "What time is it and list current directory contents",
+)
+EXAMPLE_QUERY_OPTIONS = ("",) + EXAMPLE_QUERIES
+
+def render_agent_events_md(events) -> str:
+    """Render agent events into a single Markdown block"""
+    md_parts = []
+    for event in events:
+        event_time = event.timestamp_str
+        if event.event_type == "message":
+            md_parts.append(f"**[{event_time}] Message:** {event.message}")
+        elif event.event_type == "tool_use":
+            md_parts.append(f"**[{event_time}] Tool Use:** {event.tool_name} with input {event.tool_input}")
+        elif event.event_type == "text":
+            md_parts.append(f"**[{event_time}] Text:** {event.message}")
+    return "\n\n".join(md_parts)
+
+@st.fragment(run_every=1)
+def render_discovery_status(agent_manager):
+    """Show a notice while MCP tools are discovered, polling until discovery finishes"""
+    if agent_manager.discovering_tools:
+        st.info("⏳ Discovering MCP tools...")
+    else:
+        # Rerun the whole app once so the notice (and this polling fragment) goes away
+        st.rerun()
+
+def render_events_panel(agent_manager):
+    """Render the agent event log"""
+    # Add a scrollable box for events
+    event_box = st.container(height=1000)
+    with event_box:
+        event_box.markdown("### Agent Events")
+
+        # Re-render only when new events were recorded since the last rerun
+        cached = st.session_state.get("agent_events_md")
+        if cached is None or cached[0] != agent_manager.agent_event_count:
+            cached = (agent_manager.agent_event_count, render_agent_events_md(agent_manager.agent_events))
+            st.session_state.agent_events_md = cached
+        event_box.markdown(cached[1])
 
 def main():
     st.title("🤖 Strands Multi-Agent Interface")
     st.markdown("**Intelligent task decomposition and execution with specialized agents**")
     
-    # Initialize session state
+    # Initialize session state (the manager keeps its MCP sessions open across reruns)
     if 'agent_manager' not in st.session_state:
         with st.spinner('Initializing agents...'):
             st.session_state.agent_manager = StrandsAgentManager()
@@ -434,22 +743,16 @@ def main():
         
         # Available tools info
         st.subheader("🛠️ Available Tools")
-        tools_info = {
-            "AWS Operations": "✅ use_aws tool",
-            "Shell Commands": "✅ shell tool (kubectl, docker, git)",
-            "Mathematics": "✅ calculator tool", 
-            "Time Operations": "✅ current_time tool",
-            "GitHub MCP": "⚠️ Available when configured",
-            "AWS Docs MCP": "⚠️ Available when configured"
-        }
-        
-        for tool, status in tools_info.items():
-            st.write(f"**{tool}**: {status}")
+        st.markdown(TOOLS_INFO_MD)
         
+        if st.session_state.agent_manager.discovering_tools:
+            render_discovery_status(st.session_state.agent_manager)
+
         # Environment status
         st.subheader("🌍 Environment")
-        aws_configured = bool(os.getenv("AWS_ACCESS_KEY_ID"))
-        github_configured = bool(os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"))
+        env = st.session_state.agent_manager.env
+        aws_configured = bool(env["aws_key"])
+        github_configured = bool(env["github_token"])
         
         st.write(f"**AWS**: {'✅ Configured' if aws_configured else '❌ Not configured'}")
         st.write(f"**GitHub**: {'✅ Configured' if github_configured else '❌ Not configured'}")
@@ -489,16 +792,8 @@ def main():
         
         # Example queries
         st.subheader("💡 Example Queries")
-        example_queries = [
-            "Find issues with EKS cluster sliverblaze",
-            "List all AWS EC2 instances in us-east-1", 
-            "Check kubectl cluster info and node status",
-            "Calculate the average of 10, 20, 30, 40, 50",
-            "What time is it and list current directory contents"
-        ]
-        
         # Pre-defined query selection
-        selected_example = st.selectbox("Choose an example:", [""] + example_queries)
+        selected_example = st.selectbox("Choose an example:", EXAMPLE_QUERY_OPTIONS)
         if selected_example and st.button("Use Example"):
             query_input = selected_example
     
@@ -511,10 +806,10 @@ def main():
                     pass
                 
                 # Execute the query
-                response = st.session_state.agent_manager.execute_query(
+                response = asyncio.run(st.session_state.agent_manager.execute_query(
                     query_input.strip(), 
                     progress_callback=update_progress
-                )
+                ))
                 
                 # Add to chat history
                 st.session_state.chat_history.append((query_input.strip(), response))
@@ -528,22 +823,7 @@ def main():
     with col2:
         st.subheader("📊 Agent Log")
 
-        # Add a scrollable box for events
-        event_box = st.container(height=1000)
-        with event_box:
-            event_box.markdown("### Agent Events")
-            # event_box.markdown("<div style='height:300px; overflow-y:auto; border:1px solid #ccc; padding:10px;'>", unsafe_allow_html=True)
-            for event in st.session_state.agent_manager.agent_events:
-                event_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event.timestamp))
-                if event.event_type == "message":
-                    event_box.markdown(f"**[{event_time}] Message:** {event.message}")
-                elif event.event_type == "tool_use":
-                    event_box.markdown(f"**[{event_time}] Tool Use:** {event.tool_name} with input {event.tool_input}")
-                elif event.event_type == "text":
-                    event_box.markdown(f"**[{event_time}] Text:** {event.message}")
-                elif event.event_type == "n/a":
-                    continue
-            event_box.markdown("</div>", unsafe_allow_html=True)
+        render_events_panel(st.session_state.agent_manager)
         
     # Footer
     st.markdown("---")